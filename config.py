@@ -3,11 +3,13 @@ Configuration module for the Nagios Passive Receiver.
 Loads settings from environment variables and API keys from JSON file.
 """
 
-import json
 import logging
+import os
+import orjson
 from pathlib import Path
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Dict, Optional
+from typing import Dict, FrozenSet, Literal, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,9 @@ class APIKeyConfig:
         """Initialize API key config from JSON file."""
         self.config_path = Path(config_path)
         self._api_keys: Dict[str, str] = {}
+        self._keys_fset: FrozenSet[str] = frozenset()
+        self._names: Dict[str, str] = self._api_keys
+        self._mtime_ns: Optional[int] = None
         self.load_api_keys()
 
     def load_api_keys(self) -> None:
@@ -28,22 +33,36 @@ class APIKeyConfig:
                 logger.warning(f"API keys file not found: {self.config_path}")
                 return
 
-            with open(self.config_path, "r") as f:
-                data = json.load(f)
+            with open(self.config_path, "rb") as f:
+                # Skip the parse entirely if the file is unchanged since the
+                # last successful load
+                mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                if mtime_ns == self._mtime_ns:
+                    logger.info(f"API keys file unchanged: {self.config_path}")
+                    return
+                data = orjson.loads(f.read())
 
-            self._api_keys = {}
+            api_keys: Dict[str, str] = {}
             for entry in data.get("api_keys", []):
                 if entry.get("enabled", True):
                     key = entry.get("key")
                     name = entry.get("name")
                     if key and name:
-                        self._api_keys[key] = name
+                        api_keys[key] = name
+
+            # Publish the parsed keys all at once so a reload never exposes a
+            # partially built mapping; the frozenset snapshot is used by the
+            # authentication hot path and is rebuilt only here
+            self._api_keys = api_keys
+            self._keys_fset = frozenset(api_keys)
+            self._names = api_keys
+            self._mtime_ns = mtime_ns
 
             logger.info(
                 f"Loaded {len(self._api_keys)} API key(s) from {self.config_path}"
             )
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in API keys file: {e}")
             raise
         except Exception as e:
@@ -51,7 +70,7 @@ class APIKeyConfig:
             raise
 
     def get_api_keys_dict(self) -> Dict[str, str]:
-        """Get dictionary of valid API keys."""
+        """Get dictionary of valid API keys (parsed once per load)."""
         return self._api_keys
 
     def reload(self) -> None:
@@ -76,6 +95,18 @@ class Settings(BaseSettings):
     port: int = 8000
     tls_cert_file: Optional[str] = None
     tls_key_file: Optional[str] = None
+    log_level: Literal["critical", "error", "warning", "info", "debug"] = "warning"
+    openapi_enabled: bool = True
+    # Worker processes share the listening socket and each run their own
+    # flusher; every nagios.cmd write is capped at PIPE_BUF bytes (see
+    # models.py) so writes from different workers cannot tear lines
+    workers: int = Field(default_factory=lambda: os.cpu_count() or 1, ge=1)
+
+    @field_validator("log_level", mode="before")
+    @classmethod
+    def normalize_log_level(cls, v):
+        """Accept log level names in any case."""
+        return v.lower() if isinstance(v, str) else v
 
 
 # Global settings instance
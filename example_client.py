@@ -3,13 +3,17 @@
 Example script demonstrating how to send a passive check to the Nagios receiver.
 """
 
-import requests
+import asyncio
+import httpx
 import sys
 
 # Configuration
 API_URL = "http://localhost:8000/api/v1/passive-check"
 API_KEY = "your-secret-key-1"  # Replace with your actual API key
 
+# Shared client so every check reuses the same keep-alive connection
+_client = httpx.Client(timeout=5.0, headers={"X-API-Key": API_KEY})
+
 
 def send_passive_check(host_name, service_description, return_code, plugin_output):
     """
@@ -21,8 +25,6 @@ def send_passive_check(host_name, service_description, return_code, plugin_outpu
         return_code: 0=OK, 1=WARNING, 2=CRITICAL, 3=UNKNOWN
         plugin_output: Output message from the check
     """
-    headers = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
-
     payload = {
         "host_name": host_name,
         "service_description": service_description,
@@ -31,50 +33,100 @@ def send_passive_check(host_name, service_description, return_code, plugin_outpu
     }
 
     try:
-        response = requests.post(API_URL, headers=headers, json=payload)
+        response = _client.post(API_URL, json=payload)
         response.raise_for_status()
 
         result = response.json()
         print(f"✓ Success: {result['message']}")
         return True
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"✗ Error: {e}", file=sys.stderr)
-        if hasattr(e, "response") and e.response is not None:
+        if isinstance(e, httpx.HTTPStatusError):
             print(f"Response: {e.response.text}", file=sys.stderr)
         return False
 
 
+async def send_passive_checks_async(checks):
+    """
+    Send several passive check results concurrently over one connection pool.
+
+    Args:
+        checks: Iterable of (host_name, service_description, return_code,
+            plugin_output) tuples
+
+    Returns:
+        List of booleans, one per check, indicating success
+    """
+    async with httpx.AsyncClient(timeout=5.0, headers={"X-API-Key": API_KEY}) as client:
+
+        async def send(host_name, service_description, return_code, plugin_output):
+            payload = {
+                "host_name": host_name,
+                "service_description": service_description,
+                "return_code": return_code,
+                "plugin_output": plugin_output,
+            }
+
+            try:
+                response = await client.post(API_URL, json=payload)
+                response.raise_for_status()
+
+                result = response.json()
+                print(f"✓ Success: {result['message']}")
+                return True
+
+            except httpx.HTTPError as e:
+                print(f"✗ Error: {e}", file=sys.stderr)
+                if isinstance(e, httpx.HTTPStatusError):
+                    print(f"Response: {e.response.text}", file=sys.stderr)
+                return False
+
+        return await asyncio.gather(*(send(*check) for check in checks))
+
+
 if __name__ == "__main__":
-    # Example 1: OK status
-    print("Example 1: Sending OK status...")
-    send_passive_check(
-        host_name="webserver01",
-        service_description="HTTP Check",
-        return_code=0,
-        plugin_output="HTTP OK - Response time: 0.234s",
-    )
+    with _client:
+        # Example 1: OK status
+        print("Example 1: Sending OK status...")
+        send_passive_check(
+            host_name="webserver01",
+            service_description="HTTP Check",
+            return_code=0,
+            plugin_output="HTTP OK - Response time: 0.234s",
+        )
 
-    print("\nExample 2: Sending WARNING status...")
-    send_passive_check(
-        host_name="dbserver01",
-        service_description="Disk Usage",
-        return_code=1,
-        plugin_output="WARNING - Disk usage at 85%",
-    )
+        print("\nExample 2: Sending WARNING status...")
+        send_passive_check(
+            host_name="dbserver01",
+            service_description="Disk Usage",
+            return_code=1,
+            plugin_output="WARNING - Disk usage at 85%",
+        )
 
-    print("\nExample 3: Sending CRITICAL status...")
-    send_passive_check(
-        host_name="appserver01",
-        service_description="Memory Usage",
-        return_code=2,
-        plugin_output="CRITICAL - Memory usage at 95%",
-    )
+        print("\nExample 3: Sending CRITICAL status...")
+        send_passive_check(
+            host_name="appserver01",
+            service_description="Memory Usage",
+            return_code=2,
+            plugin_output="CRITICAL - Memory usage at 95%",
+        )
+
+        print("\nExample 4: Sending UNKNOWN status...")
+        send_passive_check(
+            host_name="testserver01",
+            service_description="Custom Check",
+            return_code=3,
+            plugin_output="UNKNOWN - Unable to determine status",
+        )
 
-    print("\nExample 4: Sending UNKNOWN status...")
-    send_passive_check(
-        host_name="testserver01",
-        service_description="Custom Check",
-        return_code=3,
-        plugin_output="UNKNOWN - Unable to determine status",
+    print("\nExample 5: Sending several checks concurrently...")
+    asyncio.run(
+        send_passive_checks_async(
+            [
+                ("webserver01", "HTTP Check", 0, "HTTP OK - Response time: 0.198s"),
+                ("dbserver01", "Disk Usage", 0, "OK - Disk usage at 42%"),
+                ("appserver01", "Memory Usage", 1, "WARNING - Memory usage at 82%"),
+            ]
+        )
     )
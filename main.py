@@ -2,11 +2,9 @@
 Main FastAPI application for Nagios Passive Receiver.
 """
 
-from fastapi import FastAPI, HTTPException, Security, Depends, status
-from fastapi.security import APIKeyHeader
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 import logging
-from datetime import datetime
 
 from config import settings, api_key_config
 from models import (
@@ -15,11 +13,12 @@ from models import (
     HealthResponse,
     HostCheckRequest,
 )
-from nagios_writer import NagiosCommandWriter
+from nagios_writer import NagiosCommandWriter, clock
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level=settings.log_level.upper(),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
@@ -28,54 +27,122 @@ app = FastAPI(
     title="Nagios Passive Receiver",
     description="HTTP API for receiving passive check results for Nagios",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    # Schema generation and the docs UIs are skipped entirely when disabled
+    openapi_url="/openapi.json" if settings.openapi_enabled else None,
 )
 
 # Initialize Nagios command writer
 nagios_writer = NagiosCommandWriter(settings.nagios_cmd_path)
 
-# API Key authentication
-api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start the background tasks for the clock and the nagios.cmd flusher."""
+    nagios_writer.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """Stop the background tasks and close nagios.cmd."""
+    await nagios_writer.stop()
 
 
-async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
+# Bound reference to the API key config used on every authenticated request
+_KEYS = api_key_config
+
+
+class APIKeyMiddleware:
     """
-    Verify the API key from the request header.
+    ASGI middleware verifying the X-API-Key header on /api/ requests.
+
+    Every path under /api/ is protected, so unknown API paths are answered
+    with 401 rather than 404 when the key is missing or invalid. The plugin
+    name associated with a valid key is stored in the request state as
+    ``plugin_name`` for the endpoints to use.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._route_path(scope).startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                api_key = value.decode("latin-1")
+                break
+
+        if not api_key:
+            logger.warning("Request without API key")
+            response = ORJSONResponse(
+                {"detail": "Missing API key"},
+                status_code=status.HTTP_401_UNAUTHORIZED,
+            )
+        elif not _KEYS._keys_fset:
+            logger.error("No API keys configured")
+            response = ORJSONResponse(
+                {"detail": "Server configuration error"},
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        elif api_key not in _KEYS._keys_fset:
+            logger.warning("Invalid API key attempted: %s", api_key)
+            response = ORJSONResponse(
+                {"detail": "Invalid API key"},
+                status_code=status.HTTP_401_UNAUTHORIZED,
+            )
+        else:
+            plugin_name = _KEYS._names[api_key]
+            logger.info("Authenticated request from: %s", plugin_name)
+            scope.setdefault("state", {})["plugin_name"] = plugin_name
+            await self.app(scope, receive, send)
+            return
+
+        await response(scope, receive, send)
+
+    @staticmethod
+    def _route_path(scope) -> str:
+        """Return the request path without the root_path a proxy mounts it at."""
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            return path[len(root_path) :]
+        return path
+
+
+def get_plugin_name(request: Request) -> str:
+    """
+    Get the plugin name stored by APIKeyMiddleware for this request.
 
     Args:
-        api_key: API key from X-API-Key header
+        request: Incoming request
 
     Returns:
-        Plugin name associated with the API key
+        Plugin name associated with the request's API key
 
     Raises:
-        HTTPException: If API key is missing or invalid
+        HTTPException: If the request was not authenticated by the middleware
     """
-    if not api_key:
-        logger.warning("Request without API key")
+    plugin_name = getattr(request.state, "plugin_name", None)
+    if plugin_name is None:
+        logger.error("Request reached an API endpoint without authentication")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing API key"
         )
+    return plugin_name
 
-    # Get valid API keys
-    valid_keys = api_key_config.get_api_keys_dict()
-
-    if not valid_keys:
-        logger.error("No API keys configured")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Server configuration error",
-        )
-
-    # Verify the key
-    if api_key not in valid_keys:
-        logger.warning(f"Invalid API key attempted: {api_key}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
-        )
 
-    plugin_name = valid_keys[api_key]
-    logger.info(f"Authenticated request from: {plugin_name}")
-    return plugin_name
+# API Key authentication
+app.add_middleware(APIKeyMiddleware)
 
 
 @app.get("/", response_model=dict)
@@ -103,29 +170,32 @@ async def health_check():
     return HealthResponse(
         status="healthy" if is_writable else "degraded",
         nagios_cmd_writable=is_writable,
-        timestamp=datetime.utcnow(),
+        timestamp=clock.iso,
         nagios_cmd_path=settings.nagios_cmd_path,
     )
 
 
-@app.post("/api/v1/passive-check", response_model=PassiveCheckResponse)
-async def submit_passive_check(
-    check: PassiveCheckRequest, plugin_name: str = Depends(verify_api_key)
-):
+# Success bodies are built directly rather than validated through
+# response_model; the model is kept in the OpenAPI docs only
+@app.post("/api/v1/passive-check", responses={200: {"model": PassiveCheckResponse}})
+async def submit_passive_check(check: PassiveCheckRequest, request: Request):
     """
     Submit a passive check result to Nagios.
 
     Args:
         check: Passive check data including host, service, return code, and output
-        plugin_name: Authenticated plugin name (injected by dependency)
+        request: Incoming request, carrying the authenticated plugin name
 
     Returns:
-        PassiveCheckResponse indicating success or failure
+        Response with a PassiveCheckResponse body indicating success
     """
+    plugin_name = get_plugin_name(request)
     logger.info(
-        f"Received passive check from {plugin_name}: "
-        f"host={check.host_name}, service={check.service_description}, "
-        f"code={check.return_code}"
+        "Received passive check from %s: host=%s, service=%s, code=%d",
+        plugin_name,
+        check.host_name,
+        check.service_description,
+        check.return_code,
     )
 
     # Check if nagios.cmd is writable
@@ -136,14 +206,17 @@ async def submit_passive_check(
             detail="Cannot write to Nagios command file",
         )
 
-    # Write the passive check
-    success = nagios_writer.write_passive_check(check)
+    # Write the passive check; the blocking write happens in the flusher's
+    # executor, so awaiting it here never stalls the event loop
+    success = await nagios_writer.submit(check)
 
     if success:
-        return PassiveCheckResponse(
-            status="success",
-            message=f"Passive check result submitted for {check.host_name}/{check.service_description}",
-            timestamp=datetime.utcnow(),
+        return ORJSONResponse(
+            {
+                "status": "success",
+                "message": f"Passive check result submitted for {check.host_name}/{check.service_description}",
+                "timestamp": clock.iso,
+            }
         )
     else:
         logger.error("Failed to write passive check")
@@ -153,23 +226,24 @@ async def submit_passive_check(
         )
 
 
-@app.post("/api/v1/host-check", response_model=PassiveCheckResponse)
-async def submit_host_check(
-    check: HostCheckRequest, plugin_name: str = Depends(verify_api_key)
-):
+@app.post("/api/v1/host-check", responses={200: {"model": PassiveCheckResponse}})
+async def submit_host_check(check: HostCheckRequest, request: Request):
     """
     Submit a host check result to Nagios.
 
     Args:
         check: Host check data including host name, host status, and output
-        plugin_name: Authenticated plugin name (injected by dependency)
+        request: Incoming request, carrying the authenticated plugin name
 
     Returns:
-        PassiveCheckResponse indicating success or failure
+        Response with a PassiveCheckResponse body indicating success
     """
+    plugin_name = get_plugin_name(request)
     logger.info(
-        f"Received host check from {plugin_name}: "
-        f"host={check.host_name}, status={check.host_status}"
+        "Received host check from %s: host=%s, status=%d",
+        plugin_name,
+        check.host_name,
+        check.host_status,
     )
 
     # Check if nagios.cmd is writable
@@ -180,14 +254,16 @@ async def submit_host_check(
             detail="Cannot write to Nagios command file",
         )
 
-    # Write the host check
-    success = nagios_writer.write_host_check(check)
+    # Write the host check (queued to the flusher like passive checks)
+    success = await nagios_writer.submit(check)
 
     if success:
-        return PassiveCheckResponse(
-            status="success",
-            message=f"Host check result submitted for {check.host_name}",
-            timestamp=datetime.utcnow(),
+        return ORJSONResponse(
+            {
+                "status": "success",
+                "message": f"Host check result submitted for {check.host_name}",
+                "timestamp": clock.iso,
+            }
         )
     else:
         logger.error("Failed to write host check")
@@ -197,17 +273,17 @@ async def submit_host_check(
         )
 
 
+# Fixed part of the error envelope returned for unhandled exceptions
+_ERR_BODY = {"status": "error", "message": "Internal server error"}
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unexpected errors."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=exc)
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "status": "error",
-            "message": "Internal server error",
-            "timestamp": datetime.utcnow().isoformat(),
-        },
+        content={**_ERR_BODY, "timestamp": clock.iso},
     )
 
 
@@ -225,11 +301,20 @@ if __name__ == "__main__":
             port=settings.port,
             ssl_certfile=settings.tls_cert_file,
             ssl_keyfile=settings.tls_key_file,
-            log_level="info",
+            log_level=settings.log_level,
+            loop="uvloop",
+            http="httptools",
+            workers=settings.workers,
         )
     else:
         logger.info(f"Starting server without TLS on {settings.host}:{settings.port}")
         logger.warning("TLS is not configured. Consider enabling TLS in production.")
         uvicorn.run(
-            "main:app", host=settings.host, port=settings.port, log_level="info"
+            "main:app",
+            host=settings.host,
+            port=settings.port,
+            log_level=settings.log_level,
+            loop="uvloop",
+            http="httptools",
+            workers=settings.workers,
         )
@@ -2,14 +2,42 @@
 Data models for the Nagios Passive Receiver API.
 """
 
-from pydantic import BaseModel, Field, validator
+import re
+import select
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from typing import Literal
 from datetime import datetime
 
+# Characters that could cause issues in nagios.cmd
+_FORBIDDEN_RE = re.compile(r"[\n\r\t;|]")
+_NEWLINE_RE = re.compile(r"[\n\r]")
+
+# Writes of at most PIPE_BUF bytes to the nagios.cmd FIFO are atomic. Every
+# command must fit in one such write, or commands from several worker
+# processes could interleave and tear lines.
+PIPE_BUF = getattr(select, "PIPE_BUF", 512)
+
+# Bytes a command needs besides its text fields (timestamp, command name,
+# separators, return code and newline), rounded up
+_COMMAND_OVERHEAD = 64
+MAX_FIELDS_BYTES = PIPE_BUF - _COMMAND_OVERHEAD
+
+
+def _check_command_size(*fields: str) -> None:
+    """Ensure the encoded text fields fit in a single atomic command write."""
+    size = sum(len(field.encode()) for field in fields)
+    if size > MAX_FIELDS_BYTES:
+        raise ValueError(
+            f"Check result too long: {size} bytes of host, service and output "
+            f"text (max {MAX_FIELDS_BYTES})"
+        )
+
 
 class PassiveCheckRequest(BaseModel):
     """Model for passive check submission request."""
 
+    model_config = ConfigDict(frozen=True)
+
     host_name: str = Field(..., description="Name of the host in Nagios")
     service_description: str = Field(
         ..., description="Description of the service in Nagios"
@@ -24,31 +52,44 @@ class PassiveCheckRequest(BaseModel):
         ..., description="Output text from the monitoring plugin"
     )
 
-    @validator("host_name", "service_description")
-    def validate_no_special_chars(cls, v):
+    @field_validator("host_name", "service_description")
+    @classmethod
+    def validate_no_special_chars(cls, v: str) -> str:
         """Ensure no special characters that could break nagios.cmd format."""
         if not v or not v.strip():
             raise ValueError("Field cannot be empty")
 
         # Disallow characters that could cause issues in nagios.cmd
-        forbidden_chars = ["\n", "\r", "\t", ";", "|"]
-        for char in forbidden_chars:
-            if char in v:
-                raise ValueError(f"Field contains forbidden character: {repr(char)}")
+        match = _FORBIDDEN_RE.search(v)
+        if match:
+            raise ValueError(
+                f"Field contains forbidden character: {repr(match.group())}"
+            )
 
         return v.strip()
 
-    @validator("plugin_output")
-    def validate_output(cls, v):
+    @field_validator("plugin_output")
+    @classmethod
+    def validate_output(cls, v: str) -> str:
         """Ensure plugin output doesn't contain newlines."""
-        if "\n" in v or "\r" in v:
+        if _NEWLINE_RE.search(v):
             raise ValueError("Plugin output cannot contain newlines")
         return v
 
+    @model_validator(mode="after")
+    def validate_command_size(self) -> "PassiveCheckRequest":
+        """Ensure the resulting nagios.cmd line fits in one atomic write."""
+        _check_command_size(
+            self.host_name, self.service_description, self.plugin_output
+        )
+        return self
+
 
 class HostCheckRequest(BaseModel):
     """Model for host check submission request."""
 
+    model_config = ConfigDict(frozen=True)
+
     host_name: str = Field(..., description="Name of the host in Nagios")
     host_status: int = Field(
         ...,
@@ -58,27 +99,36 @@ class HostCheckRequest(BaseModel):
     )
     plugin_output: str = Field(..., description="Output text from the host check")
 
-    @validator("host_name")
-    def validate_no_special_chars(cls, v):
+    @field_validator("host_name")
+    @classmethod
+    def validate_no_special_chars(cls, v: str) -> str:
         """Ensure no special characters that could break nagios.cmd format."""
         if not v or not v.strip():
             raise ValueError("Field cannot be empty")
 
         # Disallow characters that could cause issues in nagios.cmd
-        forbidden_chars = ["\n", "\r", "\t", ";", "|"]
-        for char in forbidden_chars:
-            if char in v:
-                raise ValueError(f"Field contains forbidden character: {repr(char)}")
+        match = _FORBIDDEN_RE.search(v)
+        if match:
+            raise ValueError(
+                f"Field contains forbidden character: {repr(match.group())}"
+            )
 
         return v.strip()
 
-    @validator("plugin_output")
-    def validate_output(cls, v):
+    @field_validator("plugin_output")
+    @classmethod
+    def validate_output(cls, v: str) -> str:
         """Ensure plugin output doesn't contain newlines."""
-        if "\n" in v or "\r" in v:
+        if _NEWLINE_RE.search(v):
             raise ValueError("Plugin output cannot contain newlines")
         return v
 
+    @model_validator(mode="after")
+    def validate_command_size(self) -> "HostCheckRequest":
+        """Ensure the resulting nagios.cmd line fits in one atomic write."""
+        _check_command_size(self.host_name, self.plugin_output)
+        return self
+
 
 class PassiveCheckResponse(BaseModel):
     """Response model for passive check submission."""
@@ -87,8 +137,9 @@ class PassiveCheckResponse(BaseModel):
         ..., description="Status of the submission"
     )
     message: str = Field(..., description="Response message")
-    timestamp: datetime = Field(
-        default_factory=datetime.utcnow, description="Response timestamp"
+    timestamp: str = Field(
+        default_factory=lambda: datetime.utcnow().isoformat(),
+        description="Response timestamp (ISO 8601)",
     )
 
 
@@ -97,7 +148,8 @@ class HealthResponse(BaseModel):
 
     status: str = Field(..., description="Health status")
     nagios_cmd_writable: bool = Field(..., description="Whether nagios.cmd is writable")
-    timestamp: datetime = Field(
-        default_factory=datetime.utcnow, description="Response timestamp"
+    timestamp: str = Field(
+        default_factory=lambda: datetime.utcnow().isoformat(),
+        description="Response timestamp (ISO 8601)",
     )
     nagios_cmd_path: str = Field(..., description="Path to nagios.cmd file")
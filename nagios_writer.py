@@ -3,32 +3,125 @@ Nagios command writer module.
 Handles writing passive check results to nagios.cmd file.
 """
 
+import asyncio
+import functools
 import os
 import time
 import logging
+from datetime import datetime
 from pathlib import Path
-from models import PassiveCheckRequest, HostCheckRequest
+from typing import List, Optional, Tuple, Union
+from models import PIPE_BUF, PassiveCheckRequest, HostCheckRequest
 
 logger = logging.getLogger(__name__)
 
+# Precompiled Nagios external command template, filled with bytes formatting;
+# the command name and object names come from the cached prefixes below
+_CHECK_RESULT_TEMPLATE = b"[%d] %b%d;%b\n"
+
+
+@functools.lru_cache(maxsize=4096)
+def _service_check_prefix(host_name: str, service_description: str) -> bytes:
+    """Encode the command prefix for a service, reused across submissions."""
+    return b"PROCESS_SERVICE_CHECK_RESULT;%b;%b;" % (
+        host_name.encode(),
+        service_description.encode(),
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _host_check_prefix(host_name: str) -> bytes:
+    """Encode the command prefix for a host, reused across submissions."""
+    return b"PROCESS_HOST_CHECK_RESULT;%b;" % host_name.encode()
+
+
+class CoarseClock:
+    """Wall clock refreshed periodically instead of queried per request."""
+
+    def __init__(self, interval: float = 0.2):
+        """
+        Initialize the clock.
+
+        Args:
+            interval: Seconds between refreshes of the cached time
+        """
+        self.interval = interval
+        self.ts = 0
+        self.iso = ""
+        self._task: Optional[asyncio.Task] = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Update the cached Unix timestamp and ISO 8601 time."""
+        self.ts = int(time.time())
+        self.iso = datetime.utcnow().isoformat()
+
+    async def run(self) -> None:
+        """Refresh the cached time until cancelled."""
+        while True:
+            self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background refresh task if it is not already running."""
+        if self._task is None or self._task.done():
+            self.refresh()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Shared clock, started by NagiosCommandWriter.start() alongside the flusher
+clock = CoarseClock()
+
 
 class NagiosCommandWriter:
     """Handles writing passive check results to Nagios command file."""
 
-    def __init__(self, cmd_path: str):
+    def __init__(
+        self, cmd_path: str, max_batch: int = 256, reprobe_interval: float = 1.0
+    ):
         """
         Initialize the Nagios command writer.
 
         Args:
             cmd_path: Path to the nagios.cmd file
+            max_batch: Maximum number of commands written in a single batch
+            reprobe_interval: Seconds between writability checks after a failure
         """
         self.cmd_path = Path(cmd_path)
+        self.max_batch = max_batch
+        self.reprobe_interval = reprobe_interval
+        self._fd: Optional[int] = None
+        self._queue: "Optional[asyncio.Queue[Tuple[bytes, asyncio.Future]]]" = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._writable_cached = self._probe_writable()
         logger.info(f"Initialized NagiosCommandWriter with path: {self.cmd_path}")
 
     def is_writable(self) -> bool:
         """
         Check if the nagios.cmd file is writable.
 
+        The result is probed once at startup and only re-probed by the
+        flusher after a write has failed.
+
+        Returns:
+            True if the file exists and is writable, False otherwise
+        """
+        return self._writable_cached
+
+    def _probe_writable(self) -> bool:
+        """
+        Check the filesystem to see if the nagios.cmd file is writable.
+
         Returns:
             True if the file exists and is writable, False otherwise
         """
@@ -50,7 +143,42 @@ class NagiosCommandWriter:
             logger.error(f"Error checking writability: {e}")
             return False
 
-    def write_passive_check(self, check: PassiveCheckRequest) -> bool:
+    def start(self) -> None:
+        """Start the background tasks for the shared clock and the flusher."""
+        clock.start()
+        if self._flusher_task is None or self._flusher_task.done():
+            self._queue = asyncio.Queue()
+            self._flusher_task = asyncio.get_running_loop().create_task(
+                self._flusher()
+            )
+
+    async def stop(self) -> None:
+        """Stop the background tasks and close the command file."""
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        await clock.stop()
+        self._close()
+
+    async def submit(self, check: Union[PassiveCheckRequest, HostCheckRequest]) -> bool:
+        """
+        Submit a service or host check result to the nagios.cmd file.
+
+        Args:
+            check: PassiveCheckRequest or HostCheckRequest object
+
+        Returns:
+            True if write was successful, False otherwise
+        """
+        if isinstance(check, HostCheckRequest):
+            return await self.write_host_check(check)
+        return await self.write_passive_check(check)
+
+    async def write_passive_check(self, check: PassiveCheckRequest) -> bool:
         """
         Write a passive check result to the nagios.cmd file.
 
@@ -63,35 +191,30 @@ class NagiosCommandWriter:
         Returns:
             True if write was successful, False otherwise
         """
-        try:
-            # Get current timestamp
-            timestamp = int(time.time())
-
-            # Format the command according to Nagios external command format
-            command = (
-                f"[{timestamp}] PROCESS_SERVICE_CHECK_RESULT;"
-                f"{check.host_name};"
-                f"{check.service_description};"
-                f"{check.return_code};"
-                f"{check.plugin_output}\n"
-            )
+        # Get current timestamp; starting lazily keeps the clock ticking even
+        # when the app's startup hook never ran
+        self.start()
+        timestamp = clock.ts
 
-            logger.info(f"Writing command to {self.cmd_path}: {command.strip()}")
+        # Format the command according to Nagios external command format
+        command = _CHECK_RESULT_TEMPLATE % (
+            timestamp,
+            _service_check_prefix(check.host_name, check.service_description),
+            check.return_code,
+            check.plugin_output.encode(),
+        )
 
-            # Write to the nagios.cmd file
-            # Using append mode and ensuring atomic write
-            with open(self.cmd_path, "a") as f:
-                f.write(command)
-                f.flush()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Writing command to %s: %s", self.cmd_path, command.decode().rstrip()
+            )
 
+        success = await self._enqueue(command)
+        if success:
             logger.info("Successfully wrote passive check result")
-            return True
-
-        except Exception as e:
-            logger.error(f"Error writing to nagios.cmd: {e}", exc_info=True)
-            return False
+        return success
 
-    def write_host_check(self, check: HostCheckRequest) -> bool:
+    async def write_host_check(self, check: HostCheckRequest) -> bool:
         """
         Write a host check result to the nagios.cmd file.
 
@@ -104,29 +227,131 @@ class NagiosCommandWriter:
         Returns:
             True if write was successful, False otherwise
         """
-        try:
-            # Get current timestamp
-            timestamp = int(time.time())
-
-            # Format the command according to Nagios external command format
-            command = (
-                f"[{timestamp}] PROCESS_HOST_CHECK_RESULT;"
-                f"{check.host_name};"
-                f"{check.host_status};"
-                f"{check.plugin_output}\n"
-            )
+        # Get current timestamp; starting lazily keeps the clock ticking even
+        # when the app's startup hook never ran
+        self.start()
+        timestamp = clock.ts
 
-            logger.info(f"Writing command to {self.cmd_path}: {command.strip()}")
+        # Format the command according to Nagios external command format
+        command = _CHECK_RESULT_TEMPLATE % (
+            timestamp,
+            _host_check_prefix(check.host_name),
+            check.host_status,
+            check.plugin_output.encode(),
+        )
 
-            # Write to the nagios.cmd file
-            # Using append mode and ensuring atomic write
-            with open(self.cmd_path, "a") as f:
-                f.write(command)
-                f.flush()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Writing command to %s: %s", self.cmd_path, command.decode().rstrip()
+            )
 
+        success = await self._enqueue(command)
+        if success:
             logger.info("Successfully wrote host check result")
-            return True
+        return success
 
-        except Exception as e:
-            logger.error(f"Error writing to nagios.cmd: {e}", exc_info=True)
+    async def _enqueue(self, command: bytes) -> bool:
+        """Queue an encoded command for the flusher and wait for the result."""
+        # Longer commands would not be written atomically and could interleave
+        # with other workers' writes; the request models already reject them
+        if len(command) > PIPE_BUF:
+            logger.error(
+                "Refusing to write %d byte command (PIPE_BUF is %d)",
+                len(command),
+                PIPE_BUF,
+            )
             return False
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((command, future))
+        return await future
+
+    async def _flusher(self) -> None:
+        """Drain the queue, writing every pending command in one batch."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._writable_cached:
+                item = await self._queue.get()
+            else:
+                # Endpoints reject requests while unwritable, so wake up
+                # periodically to see whether the command file is back
+                try:
+                    item = await asyncio.wait_for(
+                        self._queue.get(), self.reprobe_interval
+                    )
+                except asyncio.TimeoutError:
+                    self._writable_cached = self._probe_writable()
+                    continue
+
+            batch = [item]
+            while not self._queue.empty() and len(batch) < self.max_batch:
+                batch.append(self._queue.get_nowait())
+
+            try:
+                # Blocking I/O (a FIFO open waits for a reader) runs off the loop
+                await loop.run_in_executor(
+                    None, self._write_batch, [command for command, _ in batch]
+                )
+                success = True
+            except Exception as e:
+                logger.error("Error writing to nagios.cmd: %s", e, exc_info=True)
+                self._close()
+                self._writable_cached = False
+                success = False
+
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(success)
+
+    def _write_batch(self, commands: List[bytes]) -> None:
+        """
+        Write commands with as few PIPE_BUF-sized writev calls as possible.
+
+        Each command is at most PIPE_BUF bytes (enforced in _enqueue), so
+        every writev is atomic and lines from other writers cannot interleave.
+        """
+        if self._fd is None:
+            self._open()
+
+        chunk: List[bytes] = []
+        size = 0
+        for command in commands:
+            if chunk and size + len(command) > PIPE_BUF:
+                self._write_chunk(chunk, size)
+                chunk, size = [], 0
+            chunk.append(command)
+            size += len(command)
+        if chunk:
+            self._write_chunk(chunk, size)
+
+    def _write_chunk(self, chunk: List[bytes], size: int) -> None:
+        """Write a chunk, reopening once if the reader side has gone away."""
+        try:
+            self._writev(chunk, size)
+        except BrokenPipeError:
+            # Nagios recreates nagios.cmd on restart; retry on the new pipe
+            self._close()
+            self._open()
+            self._writev(chunk, size)
+
+    def _writev(self, chunk: List[bytes], size: int) -> None:
+        """Write a chunk of commands, retrying on short writes."""
+        written = os.writev(self._fd, chunk)
+        if written < size:
+            data = b"".join(chunk)
+            while written < size:
+                written += os.write(self._fd, data[written:])
+
+    def _open(self) -> None:
+        """Open the long-lived command file descriptor."""
+        self._fd = os.open(
+            str(self.cmd_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o660
+        )
+
+    def _close(self) -> None:
+        """Close the command file descriptor if it is open."""
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None